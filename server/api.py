@@ -8,25 +8,89 @@ import os
 import uuid
 import tempfile
 import hashlib
+import subprocess
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Any
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel
 import asyncio
-from datetime import datetime
 import json
 import numpy as np
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import aiofiles
 
 # Load environment variables
 load_dotenv()
 
 # Import our video analyzer
-from video_pii_analyzer import analyze_video_for_pii, detect_pii
+from video_pii_analyzer import analyze_video_for_pii, detect_pii, detect_pii_batch
+from job_store import JobStore
 
-# In-memory storage for jobs
-jobs_storage = {}
+# Job storage: hot in-memory LRU with older jobs spilled to compressed files
+jobs_storage = JobStore(
+    capacity=int(os.getenv("JOBS_HOT_CAPACITY", "256")),
+    cold_dir=os.getenv("JOBS_COLD_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jobs"))
+)
+
+# Read size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Seconds between SSE keep-alive events while a job is still running
+JOB_EVENTS_HEARTBEAT = 15
+
+# Job states after which no further updates happen
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Longest a GET /jobs/{job_id}?wait=N long-poll may hold the request open
+MAX_JOB_WAIT = 60
+
+# Number of reusable scratch paths for uploads (extra uploads get one-off temp files)
+UPLOAD_POOL_SIZE = int(os.getenv("UPLOAD_POOL_SIZE", "8"))
+
+# Worker threads that run blocking Whisper + NER inference off the event loop
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+# Decoded 16 kHz mono audio is cached here as raw float32 for retries
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pii_audio_cache"))
+AUDIO_SAMPLE_RATE = 16000
+# Least recently used decodes are deleted once the cache grows past this size
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(2 << 30)))
+
+# Silero VAD settings used to skip silent/music-only stretches before Whisper
+VAD_PARAMETERS = {"min_silence_duration_ms": 500}
+
+# Number of 30s audio windows transcribed per Whisper forward pass
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "16"))
+
+def load_whisper_model(model_size: str = "base"):
+    """Load Whisper on the faster-whisper (CTranslate2) backend with int8 weights"""
+    import torch
+
+    whisper_cache = os.getenv("WHISPER_CACHE", os.path.expanduser("~/.cache/whisper"))
+
+    # Optional fp16 transformers backend with fused attention on GPU
+    if os.getenv("WHISPER_BACKEND") == "transformers" and torch.cuda.is_available():
+        from hf_whisper import HFWhisperModel
+        return HFWhisperModel(model_size, device="cuda", cache_dir=whisper_cache)
+
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+    compute_type = "int8_float16" if torch.cuda.is_available() else "int8"
+    model = WhisperModel(
+        model_size,
+        device="auto",
+        compute_type=compute_type,
+        num_workers=1,
+        cpu_threads=os.cpu_count() or 0,
+        download_root=whisper_cache
+    )
+    # Encode/decode 30s windows as one batch instead of one window at a time
+    return BatchedInferencePipeline(model=model)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -38,27 +102,43 @@ async def lifespan(app: FastAPI):
     from video_pii_analyzer import models
     print(f"✅ Loaded {len(models)} PII detection models")
     
-    # Preload Whisper model by importing whisper and loading default model
-    import whisper
+    # Preload Whisper model on the CTranslate2 (faster-whisper) int8 backend
     print("🎤 Loading Whisper model...")
-    whisper_model = whisper.load_model("base")
+    whisper_model = load_whisper_model()
     print("✅ Whisper model loaded successfully!")
     
     # Store models globally for access
     app.state.whisper_model = whisper_model
     app.state.pii_models = models
     
+    # Inference runs in worker threads; a single GPU is shared one job at a time
+    import torch
+    app.state.executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    app.state.inference_slots = asyncio.Semaphore(1 if torch.cuda.is_available() else INFERENCE_WORKERS)
+    
+    # Preallocate scratch paths for uploads instead of creating one per request
+    app.state.upload_dir = tempfile.mkdtemp(prefix="pii_uploads_")
+    app.state.temp_pool = asyncio.Queue()
+    app.state.pooled_paths = set()
+    for i in range(UPLOAD_POOL_SIZE):
+        path = os.path.join(app.state.upload_dir, f"upload_{i}.mp4")
+        app.state.pooled_paths.add(path)
+        app.state.temp_pool.put_nowait(path)
+    
     print("🚀 All AI models preloaded - API ready for requests!")
     
     yield
     
     # Shutdown: Clean up any remaining temp files
     print("🛑 Shutting down API")
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
+    shutil.rmtree(app.state.upload_dir, ignore_errors=True)
 
 app = FastAPI(
     title="Video PII Analyzer API",
     description="API for detecting PII in video content using multiple ML models (In-Memory Storage)",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -71,61 +151,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prebuilt timestamp pattern for job bookkeeping (same output as datetime.now().isoformat())
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def _now_iso() -> str:
+    """Local wall-clock timestamp in ISO 8601 with microseconds"""
+    t = time.time()
+    return time.strftime(_ISO_FORMAT, time.localtime(t)) + ".%06d" % int((t % 1) * 1e6)
+
 # In-memory job management functions
 def create_job(job_id: str, filename: str, original_filename: str, status: str = "queued"):
     """Create a new job in memory"""
-    jobs_storage[job_id] = {
+    jobs_storage.put(job_id, {
         "job_id": job_id,
         "status": status,
         "filename": filename,
         "original_filename": original_filename,
-        "created_at": datetime.now().isoformat(),
+        "created_at": _now_iso(),
         "completed_at": None,
         "transcript": "",
         "pii_detected": [],
         "pii_segments": [],
         "summary": {},
         "error": None
-    }
+    })
+
+# Per-job events set whenever a job changes. Jobs are only updated from the
+# event loop thread, so plain asyncio.Events are enough.
+job_change_events: Dict[str, asyncio.Event] = {}
+
+def notify_job_changed(job_id: str):
+    """Wake everyone waiting on this job"""
+    event = job_change_events.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+async def wait_for_job_change(job_id: str, timeout: float) -> bool:
+    """Wait until the job changes or the timeout passes; True if it changed"""
+    event = job_change_events.setdefault(job_id, asyncio.Event())
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
 
 def update_job_status(job_id: str, status: str, error: str = None):
     """Update job status in memory"""
-    if job_id in jobs_storage:
-        jobs_storage[job_id]["status"] = status
+    job = jobs_storage.get(job_id)
+    if job is not None:
+        job["status"] = status
         if error:
-            jobs_storage[job_id]["error"] = error
+            job["error"] = error
         if status in ["completed", "failed"]:
-            jobs_storage[job_id]["completed_at"] = datetime.now().isoformat()
+            job["completed_at"] = _now_iso()
+        notify_job_changed(job_id)
 
 def update_job_results(job_id: str, transcript: str, pii_detected: list, pii_segments: list, summary: dict):
     """Update job results in memory"""
-    if job_id in jobs_storage:
-        jobs_storage[job_id].update({
+    job = jobs_storage.get(job_id)
+    if job is not None:
+        job.update({
             "status": "completed",
             "transcript": transcript,
             "pii_detected": pii_detected,
             "pii_segments": pii_segments,
             "summary": summary,
-            "completed_at": datetime.now().isoformat()
+            "completed_at": _now_iso()
         })
+        notify_job_changed(job_id)
 
 def get_job(job_id: str):
     """Get job from memory"""
     return jobs_storage.get(job_id)
 
 def list_jobs(limit: int = 50, offset: int = 0):
-    """List jobs from memory"""
-    all_jobs = list(jobs_storage.values())
-    # Sort by created_at descending
-    all_jobs.sort(key=lambda x: x["created_at"], reverse=True)
-    return all_jobs[offset:offset + limit]
+    """List jobs from memory, newest first"""
+    return jobs_storage.recent(offset=offset, limit=limit)
 
 def delete_job(job_id: str):
     """Delete job from memory"""
-    if job_id in jobs_storage:
-        del jobs_storage[job_id]
-        return True
-    return False
+    deleted = jobs_storage.pop(job_id)
+    notify_job_changed(job_id)
+    return deleted
 
 # Response models
 class PIIEntity(BaseModel):
@@ -164,32 +271,22 @@ def create_job_id() -> str:
     """Generate unique job ID"""
     return str(uuid.uuid4())
 
-def convert_numpy_types(obj):
-    """Convert numpy types to Python native types for JSON serialization"""
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    else:
-        return obj
-
-async def analyze_video_async(job_id: str, video_path: str, whisper_model=None):
+async def analyze_video_async(job_id: str, video_path: str, whisper_model=None, audio_key: str = None):
     """Background task to analyze video"""
     try:
-        print(f"Starting analysis for job {job_id}")
-        update_job_status(job_id, "processing")
-        
-        # Run the video analysis using preloaded model
-        result = analyze_video_for_pii_api(video_path, whisper_model)
-        
-        # Convert numpy types to JSON-serializable types
-        result = convert_numpy_types(result)
+        async with app.state.inference_slots:
+            print(f"Starting analysis for job {job_id}")
+            update_job_status(job_id, "processing")
+            
+            # Run the blocking video analysis in the inference pool
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                app.state.executor,
+                analyze_video_for_pii_api,
+                video_path,
+                whisper_model,
+                audio_key
+            )
         
         # Update results in memory
         update_job_results(
@@ -206,39 +303,136 @@ async def analyze_video_async(job_id: str, video_path: str, whisper_model=None):
         print(f"Analysis failed for job {job_id}: {e}")
         update_job_status(job_id, "failed", str(e))
     finally:
-        # Clean up temp file
-        if os.path.exists(video_path):
-            os.unlink(video_path)
+        # Truncate the scratch file and hand its path back to the pool
+        release_upload_path(video_path)
+
+def acquire_upload_path() -> str:
+    """Take a pooled scratch path, or a one-off temp file when all are busy"""
+    try:
+        return app.state.temp_pool.get_nowait()
+    except asyncio.QueueEmpty:
+        # Queued jobs hold their paths until analysis ends; never block the upload on them
+        fd, path = tempfile.mkstemp(dir=app.state.upload_dir, suffix=".mp4")
+        os.close(fd)
+        return path
+
+def release_upload_path(path: str):
+    """Empty a scratch upload file and return its path to the pool (one-off files are deleted)"""
+    if path not in app.state.pooled_paths:
+        if os.path.exists(path):
+            os.unlink(path)
+        return
+    if os.path.exists(path):
+        os.truncate(path, 0)
+    app.state.temp_pool.put_nowait(path)
+
+def evict_audio_cache():
+    """Delete least recently used cached decodes until under AUDIO_CACHE_MAX_BYTES"""
+    entries = []
+    with os.scandir(AUDIO_CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".f32"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= AUDIO_CACHE_MAX_BYTES:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def load_audio(video_path: str, cache_key: str = None) -> np.ndarray:
+    """
+    Decode a video/audio file to 16 kHz mono float32 once with ffmpeg. With a
+    cache_key (the upload's SHA-1) the decode is kept for retries of the same file
+    """
+    cache_path = os.path.join(AUDIO_CACHE_DIR, f"{cache_key}.f32") if cache_key else None
+    if cache_path:
+        try:
+            audio = np.fromfile(cache_path, dtype=np.float32)
+            # Mark as recently used for eviction
+            os.utime(cache_path)
+            return audio
+        except FileNotFoundError:
+            pass
+    
+    result = subprocess.run(
+        [
+            "ffmpeg", "-nostdin", "-threads", "0", "-i", video_path,
+            "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-f", "f32le", "-"
+        ],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to decode audio: {result.stderr.decode(errors='ignore')[-500:]}")
+    
+    audio = np.frombuffer(result.stdout, dtype=np.float32)
+    if cache_path:
+        # Write under a unique name and rename, so readers never see a partial file
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=AUDIO_CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            audio.tofile(tmp)
+        os.replace(tmp.name, cache_path)
+        evict_audio_cache()
+    return audio
 
-def analyze_video_for_pii_api(video_path: str, whisper_model=None) -> Dict:
+def analyze_video_for_pii_api(video_path: str, whisper_model=None, audio_key: str = None) -> Dict:
     """Modified version of analyze_video_for_pii that returns structured data"""
     
     # Use preloaded model if provided, otherwise load it
     if whisper_model is None:
-        import whisper
-        whisper_cache = os.getenv("WHISPER_CACHE", os.path.expanduser("~/.cache/whisper"))
-        model = whisper.load_model("base", download_root=whisper_cache)
+        model = load_whisper_model()
     else:
         model = whisper_model
     
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
-    # Transcribe video
-    result = model.transcribe(video_path, task="translate")
-    full_transcript = result["text"]
+    # Decode once and hand Whisper the array instead of letting it re-run ffmpeg
+    audio = load_audio(video_path, audio_key)
     
-    # Analyze full transcript for PII
-    full_pii = detect_pii(full_transcript)
+    # Transcribe video (faster-whisper yields segments lazily)
+    segments, info = model.transcribe(
+        audio,
+        task="translate",
+        beam_size=1,
+        vad_filter=True,
+        vad_parameters=VAD_PARAMETERS,
+        batch_size=WHISPER_BATCH_SIZE,
+        # The batched pipeline defaults to one segment per VAD chunk (up to 30s);
+        # keep Whisper's phrase-level segments for the PII timestamps
+        without_timestamps=False
+    )
+    segments = list(segments)
+    segment_texts = [segment.text.strip() for segment in segments]
+    full_transcript = " ".join(segment_texts)
     
-    # Analyze segments
+    # Analyze all segments in one batched pass
+    segments_pii = detect_pii_batch(segment_texts)
+    
+    # Segments partition the transcript, so transcript-level PII is the union of
+    # segment hits shifted by each segment's offset in the joined text
+    full_pii = []
+    char_offset = 0
     pii_segments = []
-    for segment in result["segments"]:
-        start_time = f"{int(segment['start']//60)}:{int(segment['start']%60):02d}"
-        end_time = f"{int(segment['end']//60)}:{int(segment['end']%60):02d}"
-        segment_text = segment['text'].strip()
+    for segment, segment_text, segment_pii in zip(segments, segment_texts, segments_pii):
+        start_time = "%d:%02d" % divmod(int(segment.start), 60)
+        end_time = "%d:%02d" % divmod(int(segment.end), 60)
         
-        segment_pii = detect_pii(segment_text)
+        for pii_item in segment_pii:
+            full_pii.append({
+                **pii_item,
+                "start": pii_item["start"] + char_offset,
+                "end": pii_item["end"] + char_offset
+            })
+        char_offset += len(segment_text) + 1
         
         if segment_pii:
             pii_segments.append({
@@ -281,13 +475,14 @@ async def root():
             "POST /analyze/video": "Upload and analyze video for PII",
             "POST /analyze/text": "Analyze text for PII",
             "GET /jobs/{job_id}": "Get analysis results",
+            "GET /jobs/{job_id}/events": "Stream job status (server-sent events)",
             "GET /health": "Health check"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": _now_iso()}
 
 @app.post("/analyze/video")
 async def analyze_video(
@@ -304,47 +499,49 @@ async def analyze_video(
     # Generate job ID
     job_id = create_job_id()
     
-    # Save uploaded file to temp directory
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+    # Stream uploaded file to a pooled scratch path in 1 MB chunks
+    upload_path = acquire_upload_path()
+    handed_off = False
     try:
-        content = await file.read()
-        temp_file.write(content)
-        temp_file.flush()
-        temp_file.close()
+        # Hash while writing; the digest keys the decoded-audio cache
+        digest = hashlib.sha1()
+        async with aiofiles.open(upload_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                await f.write(chunk)
         
-        # Initialize job in memory
+        # Initialize job in memory (the scratch path is reused, so it is not recorded)
         create_job(
             job_id=job_id,
-            filename=temp_file.name,
+            filename=file.filename,
             original_filename=file.filename,
             status="queued"
         )
         
-        # Start background analysis with preloaded model
-        background_tasks.add_task(analyze_video_async, job_id, temp_file.name, app.state.whisper_model)
-        
-        return {
-            "job_id": job_id,
-            "status": "queued",
-            "message": "Video uploaded successfully. Analysis started.",
-            "check_status_url": f"/jobs/{job_id}"
-        }
+        # Start background analysis with preloaded model; it releases the path when done
+        background_tasks.add_task(analyze_video_async, job_id, upload_path, app.state.whisper_model, digest.hexdigest())
+        handed_off = True
         
     except Exception as e:
-        # Clean up temp file on error
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         raise HTTPException(status_code=500, detail=f"Error processing video: {e}")
+    finally:
+        # Return the scratch path on errors and on cancellation (not an Exception)
+        if not handed_off:
+            release_upload_path(upload_path)
+    
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "message": "Video uploaded successfully. Analysis started.",
+        "check_status_url": f"/jobs/{job_id}"
+    }
 
-@app.post("/analyze/text", response_model=TextAnalysisResponse)
+@app.post("/analyze/text", responses={200: {"model": TextAnalysisResponse}})
 async def analyze_text(request: TextAnalysisRequest):
     """Analyze text for PII"""
     try:
         pii_detected = detect_pii(request.text)
         
-        # Convert numpy types to JSON-serializable types
-        pii_detected = convert_numpy_types(pii_detected)
-        
         # Create summary
         pii_by_type = {}
         for pii_item in pii_detected:
@@ -360,25 +557,66 @@ async def analyze_text(request: TextAnalysisRequest):
             "has_privacy_concerns": len(pii_detected) > 0
         }
         
-        return {
+        # Serialize directly instead of re-validating every entity through pydantic
+        return ORJSONResponse({
             "pii_detected": pii_detected,
             "summary": summary
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing text: {e}")
 
 @app.get("/jobs/{job_id}")
-async def get_analysis_result(job_id: str):
-    """Get analysis results by job ID"""
+async def get_analysis_result(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT),
+    since: Optional[str] = None
+):
+    """
+    Get analysis results by job ID. With wait=N, long-poll: hold the request up
+    to N seconds until the status differs from `since` (or from the current one)
+    """
     result = get_job(job_id)
     if not result:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    seen_status = since or result["status"]
+    deadline = time.monotonic() + wait
+    while result["status"] == seen_status and result["status"] not in TERMINAL_STATUSES:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not await wait_for_job_change(job_id, remaining):
+            break
+        result = get_job(job_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Job not found")
+    
     return result
 
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream job status changes as server-sent events until the job finishes"""
+    if not get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        while True:
+            job = get_job(job_id)
+            if job is None:
+                yield b'data: {"status": "deleted"}\n\n'
+                return
+            
+            # Send the full job once it is finished, just the status before that
+            if job["status"] in TERMINAL_STATUSES:
+                yield b"data: " + orjson.dumps(job) + b"\n\n"
+                return
+            yield b"data: " + orjson.dumps({"job_id": job_id, "status": job["status"]}) + b"\n\n"
+            
+            await wait_for_job_change(job_id, JOB_EVENTS_HEARTBEAT)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 @app.get("/jobs")
-async def list_jobs_endpoint(limit: int = 50, offset: int = 0):
+async def list_jobs_endpoint(limit: int = Query(50, ge=0), offset: int = Query(0, ge=0)):
     """List all analysis jobs"""
     jobs = list_jobs(limit=limit, offset=offset)
     total_jobs = len(jobs_storage)
@@ -400,4 +638,13 @@ async def delete_job_endpoint(job_id: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Single worker: job state and models live in this process. health_monitor
+    # polls /health on an interval, so access logs are off.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        access_log=False
+    )
\ No newline at end of file
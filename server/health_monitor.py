@@ -5,6 +5,8 @@ Checks all services and provides detailed status
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import time
 import json
 import subprocess
@@ -20,33 +22,51 @@ class HealthMonitor:
             "Database": f"{base_url}/jobs",
             "Frontend": "http://localhost:3000",
         }
+        # Keep-alive connection pool shared by all checks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Command lines reused on every monitoring tick
+        self.compose_ps_cmd = ["docker-compose", "ps", "--format", "json"]
+        self.docker_stats_cmd = ["docker", "stats", "--no-stream", "--format", "table {{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}\t{{.NetIO}}"]
         
     def check_docker_services(self) -> Dict[str, Any]:
         """Check Docker container status"""
         print("🐳 Checking Docker containers...")
         try:
             result = subprocess.run(
-                ["docker-compose", "ps", "--format", "json"],
+                self.compose_ps_cmd,
                 capture_output=True,
                 text=True,
-                cwd="."
+                cwd=".",
+                timeout=10
             )
             
             if result.returncode == 0:
+                # Walk the output as one buffer of concatenated JSON documents
                 containers = []
-                for line in result.stdout.strip().split('\n'):
-                    if line:
-                        try:
-                            container = json.loads(line)
-                            containers.append({
-                                "name": container.get("Name", "Unknown"),
-                                "service": container.get("Service", "Unknown"),
-                                "state": container.get("State", "Unknown"),
-                                "status": container.get("Status", "Unknown"),
-                                "health": container.get("Health", "Unknown")
-                            })
-                        except json.JSONDecodeError:
-                            continue
+                decoder = json.JSONDecoder()
+                output = result.stdout
+                i = 0
+                while i < len(output):
+                    while i < len(output) and output[i].isspace():
+                        i += 1
+                    if i >= len(output):
+                        break
+                    try:
+                        document, i = decoder.raw_decode(output, i)
+                    except json.JSONDecodeError:
+                        break
+                    # Older Compose versions print a single JSON array
+                    for container in document if isinstance(document, list) else [document]:
+                        containers.append({
+                            "name": container.get("Name", "Unknown"),
+                            "service": container.get("Service", "Unknown"),
+                            "state": container.get("State", "Unknown"),
+                            "status": container.get("Status", "Unknown"),
+                            "health": container.get("Health", "Unknown")
+                        })
                 
                 print(f"   Found {len(containers)} containers")
                 for container in containers:
@@ -74,7 +94,7 @@ class HealthMonitor:
         """Check individual service health"""
         try:
             start_time = time.time()
-            response = requests.get(url, timeout=timeout)
+            response = self.session.get(url, timeout=timeout)
             response_time = (time.time() - start_time) * 1000  # Convert to ms
             
             if response.status_code == 200:
@@ -113,7 +133,7 @@ class HealthMonitor:
         # Test text analysis
         try:
             test_payload = {"text": "This is a test message."}
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/analyze/text",
                 json=test_payload,
                 timeout=30
@@ -132,7 +152,7 @@ class HealthMonitor:
         
         try:
             # Get job statistics
-            response = requests.get(f"{self.base_url}/jobs?limit=1", timeout=10)
+            response = self.session.get(f"{self.base_url}/jobs?limit=1", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 job_count = data.get("total", 0)
@@ -157,18 +177,18 @@ class HealthMonitor:
         try:
             # Try to get Docker stats
             result = subprocess.run(
-                ["docker", "stats", "--no-stream", "--format", "table {{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}\t{{.NetIO}}"],
+                self.docker_stats_cmd,
                 capture_output=True,
                 text=True,
                 timeout=10
             )
             
             if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                if len(lines) > 1:  # Skip header
+                stats = result.stdout.splitlines()[1:]  # Skip the header line
+                if stats:
                     return {
                         "status": "available",
-                        "stats": lines[1:]  # Skip the header line
+                        "stats": stats
                     }
             
             return {"status": "unavailable", "message": "Docker stats not available"}
@@ -203,8 +223,11 @@ class HealthMonitor:
         healthy_services = 0
         total_services = len(self.services)
         
-        for service_name, url in self.services.items():
-            service_result = self.check_service_health(service_name, url)
+        # Poll all endpoints concurrently; results come back in service order
+        with ThreadPoolExecutor(max_workers=total_services) as executor:
+            service_results = list(executor.map(self.check_service_health, self.services.keys(), self.services.values()))
+        
+        for service_name, service_result in zip(self.services, service_results):
             results["services"][service_name] = service_result
             
             if service_result["status"] == "healthy":
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Transformers-based Whisper backend for GPU inference
+Exposes the same transcribe() interface as faster-whisper's WhisperModel
+"""
+
+from collections import namedtuple
+from types import SimpleNamespace
+
+import torch
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 30
+
+Segment = namedtuple("Segment", ["start", "end", "text"])
+
+def _load_model(model_id: str, cache_dir: str = None):
+    """Load Whisper in fp16 with the fastest attention kernel available"""
+    from transformers import WhisperForConditionalGeneration
+
+    try:
+        # IO-aware fused attention (needs flash-attn and an Ampere+ GPU)
+        return WhisperForConditionalGeneration.from_pretrained(
+            model_id,
+            cache_dir=cache_dir,
+            torch_dtype=torch.float16,
+            attn_implementation="flash_attention_2"
+        )
+    except (ImportError, ValueError) as e:
+        print(f"   FlashAttention 2 unavailable ({e}), falling back")
+
+    try:
+        return WhisperForConditionalGeneration.from_pretrained(
+            model_id,
+            cache_dir=cache_dir,
+            torch_dtype=torch.float16,
+            attn_implementation="sdpa"
+        )
+    except (ImportError, ValueError):
+        model = WhisperForConditionalGeneration.from_pretrained(
+            model_id,
+            cache_dir=cache_dir,
+            torch_dtype=torch.float16
+        )
+        try:
+            from optimum.bettertransformer import BetterTransformer
+            model = BetterTransformer.transform(model)
+        except Exception as e:
+            print(f"   BetterTransformer unavailable ({e}), using eager attention")
+        return model
+
+class HFWhisperModel:
+    """Thin adapter around WhisperForConditionalGeneration"""
+
+    def __init__(self, model_size: str = "base", device: str = "cuda", cache_dir: str = None):
+        from transformers import WhisperProcessor
+
+        model_id = f"openai/whisper-{model_size}"
+        self.device = device
+        self.processor = WhisperProcessor.from_pretrained(model_id, cache_dir=cache_dir)
+        self.model = _load_model(model_id, cache_dir).to(device).eval()
+
+    def transcribe(self, audio, task: str = "transcribe", beam_size: int = 1,
+                   vad_filter: bool = False, vad_parameters: dict = None,
+                   batch_size: int = 16, **kwargs):
+        """Transcribe a file path or 16 kHz mono array, returning (segments, info)"""
+        from faster_whisper.audio import decode_audio
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        if isinstance(audio, str):
+            audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+        # Only encode speech regions found by Silero VAD
+        if vad_filter:
+            speech = get_speech_timestamps(audio, VadOptions(**(vad_parameters or {})))
+            regions = [(region["start"], region["end"]) for region in speech]
+        else:
+            regions = [(0, len(audio))]
+
+        # Split regions into non-overlapping 30s windows, keeping their start times
+        window = SAMPLE_RATE * CHUNK_SECONDS
+        chunks = []
+        for region_start, region_end in regions:
+            for offset in range(region_start, region_end, window):
+                chunk = audio[offset:min(offset + window, region_end)]
+                chunks.append((offset / SAMPLE_RATE, chunk))
+
+        segments = []
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            # (N, 80, 3000) log-mel batch for a single encoder forward
+            features = self.processor(
+                [chunk for _, chunk in batch],
+                sampling_rate=SAMPLE_RATE,
+                return_tensors="pt"
+            ).input_features.to(self.device, dtype=torch.float16)
+
+            with torch.inference_mode():
+                token_ids = self.model.generate(
+                    features,
+                    task=task,
+                    num_beams=beam_size,
+                    use_cache=True,
+                    return_timestamps=True
+                )
+
+            decoded = self.processor.batch_decode(token_ids, skip_special_tokens=True, output_offsets=True)
+            for (chunk_start, chunk), result in zip(batch, decoded):
+                for piece in result["offsets"]:
+                    start, end = piece["timestamp"]
+                    if end is None:
+                        end = len(chunk) / SAMPLE_RATE
+                    segments.append(Segment(chunk_start + start, chunk_start + end, piece["text"]))
+
+        info = SimpleNamespace(duration=len(audio) / SAMPLE_RATE, language="en")
+        return segments, info
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Bounded job storage for the Video PII Analyzer API
+Recent jobs stay in an in-memory LRU; older ones spill to zstd-compressed JSON on disk
+"""
+
+from collections import OrderedDict
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+import zstandard
+
+class JobStore:
+    """Two-tier job store: hot LRU dict in memory, cold compressed files on disk"""
+
+    def __init__(self, capacity: int = 256, cold_dir: str = ".jobs"):
+        self.capacity = capacity
+        self.cold_dir = Path(cold_dir).resolve()
+        self.cold_dir.mkdir(parents=True, exist_ok=True)
+        self.hot: "OrderedDict[str, dict]" = OrderedDict()
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+        # The cold tier only extends this process's memory: a previous run's hot jobs
+        # are gone and its unfinished jobs will never complete, so start empty
+        for path in self.cold_dir.glob("*.json.zst"):
+            path.unlink(missing_ok=True)
+
+        # Job ids in creation order across both tiers
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def _cold_path(self, job_id: str) -> Path:
+        return self.cold_dir / f"{job_id}.json.zst"
+
+    def _read_cold(self, job_id: str) -> Optional[dict]:
+        path = self._cold_path(job_id)
+        if not path.exists():
+            return None
+        return orjson.loads(self._decompressor.decompress(path.read_bytes()))
+
+    def _evict(self):
+        """Flush least recently used jobs to the cold tier until under capacity"""
+        while len(self.hot) > self.capacity:
+            job_id, job = self.hot.popitem(last=False)
+            self._cold_path(job_id).write_bytes(self._compressor.compress(orjson.dumps(job)))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._order
+
+    def put(self, job_id: str, job: dict):
+        """Insert or replace a job in the hot tier"""
+        self.hot[job_id] = job
+        self.hot.move_to_end(job_id)
+        self._order.setdefault(job_id, None)
+        self._evict()
+
+    def get(self, job_id: str, promote: bool = True) -> Optional[dict]:
+        """Get a job; with promote, mark it recently used and pull it out of the cold tier"""
+        job = self.hot.get(job_id)
+        if job is not None:
+            if promote:
+                self.hot.move_to_end(job_id)
+            return job
+        if job_id not in self._order:
+            return None
+
+        job = self._read_cold(job_id)
+        if job is not None and promote:
+            self.put(job_id, job)
+        return job
+
+    def pop(self, job_id: str) -> bool:
+        """Delete a job from both tiers"""
+        if job_id not in self._order:
+            return False
+        del self._order[job_id]
+        self.hot.pop(job_id, None)
+        self._cold_path(job_id).unlink(missing_ok=True)
+        return True
+
+    def recent(self, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Jobs newest first; cold jobs are read without being promoted"""
+        job_ids = islice(reversed(self._order), offset, offset + limit)
+        jobs = (self.get(job_id, promote=False) for job_id in job_ids)
+        return [job for job in jobs if job is not None]
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Ensemble vote over PII entities reported by the models and pattern scanners
+Overlapping detections collapse into the most confident one
+"""
+
+import numpy as np
+
+def merge_overlapping_entities(entities):
+    """Merge overlapping PII entities from different models"""
+    if not entities:
+        return []
+    
+    # Columnar copies of the fields the merge needs; dicts are only touched again on output
+    count = len(entities)
+    starts = np.fromiter((e["start"] for e in entities), dtype=np.int64, count=count)
+    ends = np.fromiter((e["end"] for e in entities), dtype=np.int64, count=count)
+    confidences = np.fromiter((e["confidence"] for e in entities), dtype=np.float64, count=count)
+    
+    # Sort by start (longest first on ties); a new overlap group begins wherever
+    # an entity starts at or after every earlier end
+    order = np.lexsort((-ends, starts))
+    sorted_starts = starts[order]
+    running_end = np.maximum.accumulate(ends[order])
+    new_group = np.empty(count, dtype=bool)
+    new_group[0] = True
+    new_group[1:] = sorted_starts[1:] >= running_end[:-1]
+    group_id = np.cumsum(new_group) - 1
+    group_starts = np.flatnonzero(new_group)
+    group_sizes = np.diff(np.append(group_starts, count))
+    
+    # Highest confidence per group, earliest in sort order on ties
+    sorted_confidences = confidences[order]
+    by_confidence = np.lexsort((np.arange(count), -sorted_confidences, group_id))
+    best = order[by_confidence[group_starts]]
+    confidence_sums = np.add.reduceat(sorted_confidences, group_starts)
+    
+    merged = []
+    for group_start, group_size, best_index, confidence_sum in zip(
+        group_starts.tolist(), group_sizes.tolist(), best.tolist(), confidence_sums.tolist()
+    ):
+        best_entity = entities[best_index]
+        if group_size > 1:
+            # Add ensemble information
+            members = order[group_start:group_start + group_size].tolist()
+            best_entity["ensemble_models"] = [entities[i]["model"] for i in members]
+            best_entity["ensemble_count"] = group_size
+            best_entity["ensemble_avg_confidence"] = confidence_sum / group_size
+        merged.append(best_entity)
+    
+    return merged
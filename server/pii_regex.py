@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Deterministic PII detection for pattern-shaped identifiers
+All patterns are compiled into one Hyperscan database and matched in a single pass
+"""
+
+try:
+    import hyperscan
+except ImportError:  # Hyperscan is x86-only; fall back to RE2, then Python's re
+    hyperscan = None
+
+try:
+    import re2 as regex_engine
+except ImportError:
+    import re as regex_engine
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # Plain Python function; the NumPy path is used instead
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# (type, pattern) pairs for PII that does not need a model to recognise
+PII_PATTERNS = [
+    ("EMAIL", r"\b[A-Z0-9._%+-]+@[A-Z0-9-]+(\.[A-Z0-9-]+)*\.[A-Z]{2,}\b"),
+    # Card numbers either run together or use one separator between every 4-digit
+    # group, so two space-separated phone numbers are not read as a single card
+    ("CREDIT_CARD", r"\b(\d{13,16}|\d{4} \d{4} \d{4} \d{1,4}|\d{4}-\d{4}-\d{4}-\d{1,4})\b"),
+    ("SSN", r"\b\d{3}-\d{2}-\d{4}\b"),
+    ("IP_ADDRESS", r"\b((25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(25[0-5]|2[0-4]\d|1?\d?\d)\b"),
+]
+
+# Phone number shapes for continuous number streams
+PHONE_PATTERNS = [
+    # Singapore mobile numbers (8 digits starting with 8 or 9)
+    r'\b[89]\d{7}\b',
+    # Singapore landline numbers (8 digits starting with 6)
+    r'\b6\d{7}\b',
+    # International formats
+    r'\+65\s?[689]\d{7}',
+    r'\(\+65\)\s?[689]\d{7}',
+    # US numbers (10 digits)
+    r'\b\d{10}\b',
+    # Generic 8-digit patterns in continuous streams
+    r'\b\d{8}\b',
+    # 11-digit patterns (like +65 format without +)
+    r'\b65[689]\d{7}\b'
+]
+
+REGEX_CONFIDENCE = 0.9
+
+# Issuer prefixes: Visa, Mastercard, Amex, Discover
+CARD_ISSUER_PREFIX = regex_engine.compile(r"4|5[1-5]|2[2-7]|3[47]|6011|64[4-9]|65")
+
+def is_valid_card_number(candidate):
+    """Issuer prefix and Luhn checksum for a matched card number"""
+    digits = [int(c) for c in candidate if c.isdigit()]
+    if not CARD_ISSUER_PREFIX.match("".join(map(str, digits[:4]))):
+        return False
+    # Double every second digit from the right
+    total = sum(digits[-1::-2]) + sum(sum(divmod(2 * d, 10)) for d in digits[-2::-2])
+    return total % 10 == 0
+
+# Post-match checks for pattern types the regex alone over-matches
+PII_VALIDATORS = {
+    "CREDIT_CARD": is_valid_card_number,
+}
+
+class PatternSet:
+    """A list of regexes matched together in one scan"""
+
+    def __init__(self, patterns, caseless=False):
+        if hyperscan is not None:
+            flags = hyperscan.HS_FLAG_SOM_LEFTMOST
+            if caseless:
+                flags |= hyperscan.HS_FLAG_CASELESS
+            self._database = hyperscan.Database()
+            self._database.compile(
+                expressions=[pattern.encode() for pattern in patterns],
+                ids=list(range(len(patterns))),
+                flags=[flags] * len(patterns)
+            )
+        else:
+            # Inline flag: google-re2 has no IGNORECASE constant, but both engines accept (?i)
+            prefix = "(?i)" if caseless else ""
+            self._compiled = [regex_engine.compile(prefix + pattern) for pattern in patterns]
+
+    def spans(self, text):
+        """Return {(pattern_id, start): end} for the longest match at each start"""
+        spans = {}
+        if hyperscan is None:
+            for pattern_id, regex in enumerate(self._compiled):
+                for match in regex.finditer(text):
+                    spans[(pattern_id, match.start())] = match.end()
+            return spans
+
+        data = text.encode("utf-8")
+
+        def on_match(pattern_id, start, end, flags, context):
+            # Hyperscan reports every end position; keep the longest per start
+            if end > spans.get((pattern_id, start), -1):
+                spans[(pattern_id, start)] = end
+
+        self._database.scan(data, match_event_handler=on_match)
+
+        if text.isascii():
+            return spans
+        # Translate UTF-8 byte offsets back to character offsets
+        def char_offset(byte_offset):
+            return len(data[:byte_offset].decode("utf-8", errors="ignore"))
+
+        return {(pattern_id, char_offset(start)): char_offset(end) for (pattern_id, start), end in spans.items()}
+
+_pii_patterns = PatternSet([pattern for _, pattern in PII_PATTERNS], caseless=True)
+_phone_patterns = PatternSet(PHONE_PATTERNS)
+
+def scan_pii(text):
+    """Find deterministic PII in text with a single multi-pattern scan"""
+    matches = []
+    for (pattern_id, start), end in sorted(_pii_patterns.spans(text).items()):
+        validator = PII_VALIDATORS.get(PII_PATTERNS[pattern_id][0])
+        if validator is not None and not validator(text[start:end]):
+            continue
+        # Drop matches nested inside a longer match of the same type
+        if matches and matches[-1]["pattern_id"] == pattern_id and start < matches[-1]["end"]:
+            continue
+        matches.append({"pattern_id": pattern_id, "start": start, "end": end})
+
+    return [
+        {
+            "type": PII_PATTERNS[match["pattern_id"]][0],
+            "text": text[match["start"]:match["end"]],
+            "confidence": REGEX_CONFIDENCE,
+            "start": match["start"],
+            "end": match["end"]
+        }
+        for match in matches
+    ]
+
+def scan_phone_candidates(text):
+    """Candidate phone number spans from all phone patterns, deduplicated by (start, end)"""
+    return sorted({(start, end) for (_, start), end in _phone_patterns.spans(text).items()})
+
+_SG_LEADING_DIGITS = (ord('6'), ord('8'), ord('9'))
+_PREFIX_65 = int.from_bytes(b'65', 'little')
+
+def valid_sg_phone_mask(candidates):
+    """
+    Vectorized Singapore validity check over candidate numbers.
+    Each candidate's leading bytes are packed into a little-endian uint64, so the
+    first digit, the '65' prefix and the digit after it are mask/compare ops.
+    """
+    lengths = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+    packed = b"".join(c[:8].encode("ascii", "replace").ljust(8, b"\0") for c in candidates)
+    words = np.frombuffer(packed, dtype="<u8")
+    
+    first_byte = words & 0xFF
+    third_byte = (words >> 16) & 0xFF
+    has_65_prefix = (words & 0xFFFF) == _PREFIX_65
+    
+    def leading_ok(byte):
+        return (byte == _SG_LEADING_DIGITS[0]) | (byte == _SG_LEADING_DIGITS[1]) | (byte == _SG_LEADING_DIGITS[2])
+    
+    return (
+        ((lengths == 8) & leading_ok(first_byte))
+        | ((lengths == 10) & has_65_prefix & leading_ok(third_byte))
+        | ((lengths == 10) & ~has_65_prefix)  # US format
+    )
+
+@njit(cache=True)
+def _validate_sg_spans(buf, starts, ends, out):
+    """Singapore validity for each (start, end) span of an ASCII byte buffer"""
+    for k in range(len(starts)):
+        start = starts[k]
+        length = ends[k] - start
+        c0 = buf[start]
+        if length == 8:
+            out[k] = c0 == 54 or c0 == 56 or c0 == 57  # '6', '8', '9'
+        elif length == 10 and c0 == 54 and buf[start + 1] == 53:  # '65' prefix
+            c2 = buf[start + 2]
+            out[k] = c2 == 54 or c2 == 56 or c2 == 57
+        elif length == 10:  # US format
+            out[k] = True
+        else:
+            out[k] = False
+
+def detect_phone_numbers_in_stream(text):
+    """Enhanced phone number detection for continuous number streams"""
+    # One fused scan over all phone patterns, duplicates already removed
+    spans = scan_phone_candidates(text)
+    if not spans:
+        return []
+    candidates = [text[start:end] for start, end in spans]
+    
+    # Additional validation for Singapore numbers, only survivors reach Python
+    if NUMBA_AVAILABLE and text.isascii():
+        bounds = np.array(spans, dtype=np.int64)
+        valid = np.empty(len(spans), dtype=np.bool_)
+        _validate_sg_spans(np.frombuffer(text.encode("ascii"), dtype=np.uint8), bounds[:, 0], bounds[:, 1], valid)
+    else:
+        valid = valid_sg_phone_mask(candidates)
+    return [
+        {
+            "type": "PHONE_NUMBER",
+            "text": candidates[k],
+            "confidence": 0.9,
+            "start": spans[k][0],
+            "end": spans[k][1]
+        }
+        for k in np.flatnonzero(valid)
+    ]
+
+def mask_spans(text, entities):
+    """Blank out matched spans so offsets are preserved for the NER pass"""
+    chars = list(text)
+    for entity in entities:
+        chars[entity["start"]:entity["end"]] = " " * (entity["end"] - entity["start"])
+    return "".join(chars)
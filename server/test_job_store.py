@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier job store
+"""
+
+from job_store import JobStore
+
+def test_listing_does_not_touch_recency(tmp_path):
+    store = JobStore(capacity=2, cold_dir=tmp_path / "jobs")
+    store.put("a", {"job_id": "a"})
+    store.put("b", {"job_id": "b"})
+
+    # Listing reads "a" but must not save it from eviction
+    assert [job["job_id"] for job in store.recent()] == ["b", "a"]
+    store.put("c", {"job_id": "c"})
+    assert list(store.hot) == ["b", "c"]
+    assert store.get("a", promote=False) == {"job_id": "a"}
+
+def test_cold_tier_starts_empty(tmp_path):
+    store = JobStore(capacity=1, cold_dir=tmp_path / "jobs")
+    store.put("a", {"job_id": "a", "status": "processing"})
+    store.put("b", {"job_id": "b", "status": "queued"})
+
+    restarted = JobStore(capacity=1, cold_dir=tmp_path / "jobs")
+    assert len(restarted) == 0
+    assert restarted.get("a") is None
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar ensemble merge against the plain sort-and-sweep it replaced
+"""
+
+import copy
+import random
+
+import pytest
+
+from pii_merge import merge_overlapping_entities
+
+def reference_merge(entities):
+    """Sort by (start, -end) and sweep overlap groups, keeping the most confident"""
+    if not entities:
+        return []
+    
+    entities = sorted(entities, key=lambda x: (x["start"], -x["end"]))
+    merged = []
+    
+    def flush(group):
+        if len(group) == 1:
+            merged.append(group[0])
+            return
+        best_entity = max(group, key=lambda x: x["confidence"])
+        best_entity["ensemble_models"] = [e["model"] for e in group]
+        best_entity["ensemble_count"] = len(group)
+        best_entity["ensemble_avg_confidence"] = sum(e["confidence"] for e in group) / len(group)
+        merged.append(best_entity)
+    
+    group = [entities[0]]
+    group_end = entities[0]["end"]
+    for entity in entities[1:]:
+        if entity["start"] < group_end:
+            group.append(entity)
+            group_end = max(group_end, entity["end"])
+        else:
+            flush(group)
+            group = [entity]
+            group_end = entity["end"]
+    flush(group)
+    
+    return merged
+
+def random_entities(rng):
+    entities = []
+    for i in range(rng.randint(0, 12)):
+        start = rng.randint(0, 40)
+        entities.append({
+            "type": "X",
+            "text": "",
+            "confidence": rng.choice([0.5, 0.9, rng.random()]),
+            "start": start,
+            "end": start + rng.randint(1, 8),
+            "model": f"m{i}"
+        })
+    return entities
+
+def test_matches_reference_sweep():
+    rng = random.Random(0)
+    for _ in range(5000):
+        entities = random_entities(rng)
+        expected = reference_merge(copy.deepcopy(entities))
+        actual = merge_overlapping_entities(copy.deepcopy(entities))
+        
+        assert len(actual) == len(expected)
+        for got, want in zip(actual, expected):
+            # Group averages are summed in a different order
+            assert got.pop("ensemble_avg_confidence", None) == pytest.approx(want.pop("ensemble_avg_confidence", None))
+            assert got == want
+
+def test_ties_keep_the_longer_earlier_entity():
+    entities = [
+        {"type": "A", "text": "", "confidence": 0.9, "start": 2, "end": 5, "model": "short"},
+        {"type": "B", "text": "", "confidence": 0.9, "start": 2, "end": 9, "model": "long"},
+        {"type": "C", "text": "", "confidence": 0.9, "start": 12, "end": 14, "model": "alone"},
+    ]
+    merged = merge_overlapping_entities(entities)
+    
+    assert [e["model"] for e in merged] == ["long", "alone"]
+    assert merged[0]["ensemble_models"] == ["long", "short"]
+    assert merged[0]["ensemble_count"] == 2
+    assert "ensemble_count" not in merged[1]
+
+def test_empty():
+    assert merge_overlapping_entities([]) == []
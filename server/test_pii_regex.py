@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the pattern scanners (Hyperscan, RE2, re) and phone number validation
+"""
+
+import importlib
+import sys
+
+import pytest
+
+ENGINES = ["hyperscan", "re2", "re"]
+
+def load_pii_regex(monkeypatch, engine):
+    """Import pii_regex matching with the given engine"""
+    if engine == "hyperscan":
+        pytest.importorskip("hyperscan")
+    else:
+        monkeypatch.setitem(sys.modules, "hyperscan", None)
+        if engine == "re":
+            monkeypatch.setitem(sys.modules, "re2", None)
+        else:
+            pytest.importorskip("re2")
+    monkeypatch.delitem(sys.modules, "pii_regex", raising=False)
+    module = importlib.import_module("pii_regex")
+    if engine == "hyperscan":
+        assert module.hyperscan is not None
+    else:
+        assert module.regex_engine.__name__ == engine
+    return module
+
+def pii_types(pii_regex, text):
+    return {(match["type"], match["text"]) for match in pii_regex.scan_pii(text)}
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_scan(monkeypatch, engine):
+    pii_regex = load_pii_regex(monkeypatch, engine)
+
+    text = "Mail John.Doe@Example.COM or call 91234567 from 10.0.0.1"
+    found = pii_types(pii_regex, text)
+    assert ("EMAIL", "John.Doe@Example.COM") in found
+    assert ("IP_ADDRESS", "10.0.0.1") in found
+
+    start = text.index("91234567")
+    assert (start, start + 8) in pii_regex.scan_phone_candidates(text)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_adjacent_phones_are_not_a_card(monkeypatch, engine):
+    pii_regex = load_pii_regex(monkeypatch, engine)
+
+    text = "call 91234567 81234567 now"
+    assert pii_regex.scan_pii(text) == []
+    assert pii_regex.scan_phone_candidates(text) == [(5, 13), (14, 22)]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_card_numbers(monkeypatch, engine):
+    pii_regex = load_pii_regex(monkeypatch, engine)
+
+    for card in ("4111 1111 1111 1111", "4111-1111-1111-1111", "4111111111111111", "4222222222222"):
+        assert pii_types(pii_regex, f"card {card} ok") == {("CREDIT_CARD", card)}
+
+    # Fails Luhn, wrong issuer, mixed separators
+    for not_card in ("4000000000001", "1234567890123", "4111 1111-1111 1111"):
+        assert pii_regex.scan_pii(f"ID {not_card} ok") == []
+
+def reference_sg_valid(phone_num):
+    """The original per-match Singapore/US validity branches"""
+    if len(phone_num) == 8:
+        return phone_num[0] in ['6', '8', '9']
+    elif len(phone_num) == 10 and phone_num.startswith('65'):
+        return phone_num[2] in ['6', '8', '9']
+    elif len(phone_num) == 10:  # US format
+        return True
+    return False
+
+PHONE_CANDIDATES = [
+    "61234567", "81234567", "91234567", "71234567", "01234567",
+    "6581234567", "6561234567", "6591234567", "6571234567", "6501234567",
+    "5551234567", "1234567890", "658123456", "65812345678", "+6591234567",
+    "(+65)91234567", "+65 91234567", "9123", "",
+]
+
+def test_sg_phone_mask_matches_reference():
+    import numpy as np
+    from pii_regex import valid_sg_phone_mask
+
+    mask = valid_sg_phone_mask(PHONE_CANDIDATES)
+    assert mask.dtype == np.bool_
+    assert mask.tolist() == [reference_sg_valid(c) for c in PHONE_CANDIDATES]
+
+def test_sg_span_validator_matches_reference():
+    import numpy as np
+    from pii_regex import _validate_sg_spans
+
+    # Candidates laid out in one buffer, as detect_phone_numbers_in_stream passes them
+    text = " ".join(PHONE_CANDIDATES)
+    spans, offset = [], 0
+    for candidate in PHONE_CANDIDATES:
+        spans.append((offset, offset + len(candidate)))
+        offset += len(candidate) + 1
+    spans = [(start, end) for start, end in spans if end > start]
+
+    bounds = np.array(spans, dtype=np.int64)
+    valid = np.empty(len(spans), dtype=np.bool_)
+    _validate_sg_spans(np.frombuffer(text.encode("ascii"), dtype=np.uint8), bounds[:, 0], bounds[:, 1], valid)
+    assert valid.tolist() == [reference_sg_valid(text[start:end]) for start, end in spans]
+
+def test_phone_stream_keeps_adjacent_numbers():
+    from pii_regex import detect_phone_numbers_in_stream
+
+    found = [(match["text"], match["start"]) for match in detect_phone_numbers_in_stream("call 91234567 81234567 now")]
+    assert found == [("91234567", 5), ("81234567", 14)]
@@ -5,16 +5,166 @@ and retrieves the analysis results
 """
 
 import requests
-import json
+from requests_toolbelt import MultipartEncoder
+import httpx
+import orjson
+import simdjson
 import time
 import os
+import hashlib
 from pathlib import Path
 import sys
+import numpy as np
+
+# Give up on a job after this many seconds (previously 60 polls x 3s)
+ANALYSIS_TIMEOUT = 180
+# Number of polls placed between upload and the 99th percentile completion time
+POLL_BUDGET = 20
+# History needed before the adaptive schedule replaces the exponential fallback
+MIN_HISTORY = 5
+MAX_HISTORY = 500
+# Read timeout for the status event stream (the server sends a heartbeat every 15s)
+EVENTS_TIMEOUT = httpx.Timeout(10.0, read=30.0)
+# Spacing of the polls after the adaptive schedule is exhausted
+TAIL_POLL_INTERVAL = 3.0
+# Seconds the server may hold each status poll open waiting for a change
+LONG_POLL_WAIT = 30
+# Extra read time allowed on top of the requested wait
+LONG_POLL_MARGIN = 5
+# Upload MIME type by file extension (anything else is sent as audio/m4a)
+MIME = {
+    '.mp4': 'video/mp4',
+    '.mov': 'video/mp4',
+    '.avi': 'video/mp4',
+    '.wav': 'audio/wav',
+    '.m4a': 'audio/m4a',
+}
+
+def poll_history_path(base_url):
+    """Per-endpoint file of observed completion times"""
+    endpoint = hashlib.sha1(base_url.encode()).hexdigest()[:8]
+    return Path.home() / f".rice_cooker_poll_hist_{endpoint}.npy"
+
+def load_poll_history(base_url):
+    try:
+        return np.load(poll_history_path(base_url))
+    except (OSError, ValueError):
+        return np.empty(0)
+
+def record_completion_time(base_url, seconds):
+    history = np.append(load_poll_history(base_url), seconds)[-MAX_HISTORY:]
+    try:
+        np.save(poll_history_path(base_url), history)
+    except OSError as e:
+        print(f"Could not save poll history: {e}")
+
+def exponential_poll_schedule(first=0.5, factor=2.0, cap=10.0, timeout=ANALYSIS_TIMEOUT):
+    """Fallback poll times (seconds after upload) when there is no history"""
+    times = []
+    t, delay = 0.0, first
+    while t + delay <= timeout:
+        t += delay
+        times.append(t)
+        delay = min(delay * factor, cap)
+    return times
+
+def adaptive_poll_schedule(samples, budget=POLL_BUDGET, timeout=ANALYSIS_TIMEOUT):
+    """
+    Poll times minimizing expected detection delay for the observed completion
+    time distribution (Rascal-style placement). With p the completion-time pdf,
+    L_i = L_{i-1} + (1 / p(L_{i-1})) * integral of p over [L_{i-2}, L_{i-1}],
+    where L_0 = 0 and L_1 is binary-searched so that L_budget reaches the 99th
+    percentile U.
+    """
+    # Never schedule past the point where the job is given up on
+    upper = min(float(np.quantile(samples, 0.99)), timeout)
+    if upper <= 0:
+        return exponential_poll_schedule(timeout=timeout)
+
+    # Gaussian KDE of completion times on a grid (Silverman bandwidth)
+    bandwidth = max(1.06 * float(np.std(samples)) * len(samples) ** -0.2, 0.1)
+    grid = np.linspace(0.0, upper * 1.5, 2048)
+    pdf = np.exp(-0.5 * ((grid[:, None] - samples[None, :]) / bandwidth) ** 2).mean(axis=1)
+    pdf /= bandwidth * np.sqrt(2 * np.pi)
+    cdf = np.concatenate(([0.0], np.cumsum((pdf[1:] + pdf[:-1]) / 2 * np.diff(grid))))
+
+    def schedule_from(first):
+        times = [first]
+        previous = 0.0
+        while len(times) < budget and times[-1] < upper:
+            current = times[-1]
+            mass = np.interp(current, grid, cdf) - np.interp(previous, grid, cdf)
+            density = max(float(np.interp(current, grid, pdf)), 1e-9)
+            step = min(max(mass / density, 0.05), upper)
+            times.append(current + step)
+            previous = current
+        return times
+
+    # Smallest first poll whose schedule reaches U within the budget
+    low, high = 1e-3, upper
+    for _ in range(40):
+        mid = (low + high) / 2
+        if schedule_from(mid)[-1] >= upper:
+            high = mid
+        else:
+            low = mid
+    times = [t for t in schedule_from(high) if t < upper] + [upper]
+
+    # Keep polling at a fixed interval for the slow tail
+    while times[-1] + TAIL_POLL_INTERVAL <= timeout:
+        times.append(times[-1] + TAIL_POLL_INTERVAL)
+    return times
 
 class FileUploadTester:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.session = requests.Session()
+        # Persistent keep-alive connection for job status traffic
+        self.client = httpx.Client(base_url=base_url)
+        # Reused across polls; only the fields we read get materialized
+        self.parser = simdjson.Parser()
+        
+    def parse_job_status(self, content):
+        """Read status (and error) lazily; materialize the full job only when completed"""
+        doc = self.parser.parse(content)
+        status = doc.get("status")
+        data = doc.as_dict() if status in ["completed", "failed"] else None
+        # Release the document so the parser can be reused on the next poll
+        del doc
+        return status, data
+        
+    def stream_job_events(self, job_id):
+        """Follow server-sent status events; returns (handled, results)"""
+        started = time.time()
+        try:
+            with self.client.stream("GET", f"/jobs/{job_id}/events", timeout=EVENTS_TIMEOUT) as response:
+                if response.status_code != 200:
+                    return False, None
+                
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = orjson.loads(line[len("data:"):])
+                    status = event.get("status")
+                    
+                    if status == "completed":
+                        return True, event
+                    elif status == "failed":
+                        error = event.get("error", "Unknown error")
+                        print(f"Analysis failed: {error}")
+                        return True, None
+                    elif status in ["queued", "processing"]:
+                        print(f"Status: {status}...")
+                        if time.time() - started > ANALYSIS_TIMEOUT:
+                            print("Analysis timed out")
+                            return True, None
+                    else:
+                        print(f"Unknown status: {status}")
+                        return True, None
+        except httpx.HTTPError as e:
+            print(f"Status stream unavailable ({e}), falling back to polling")
+        
+        return False, None
         
     def upload_and_analyze_file(self, file_path):
         """Upload a file and wait for analysis results"""
@@ -29,23 +179,19 @@ class FileUploadTester:
         
         try:
             # Upload file - determine MIME type based on extension
-            mime_type = 'audio/m4a'
-            if file_path.suffix.lower() in ['.mp4', '.mov', '.avi']:
-                mime_type = 'video/mp4'
-            elif file_path.suffix.lower() in ['.wav']:
-                mime_type = 'audio/wav'
-            elif file_path.suffix.lower() in ['.m4a']:
-                mime_type = 'audio/m4a'
+            mime_type = MIME.get(file_path.suffix.lower(), 'audio/m4a')
                 
             with open(file_path, 'rb') as f:
-                files = {
+                # Stream the multipart body from disk instead of buffering the whole file
+                encoder = MultipartEncoder(fields={
                     'file': (file_path.name, f, mime_type)
-                }
+                })
                 
                 print("Uploading...")
                 response = self.session.post(
                     f"{self.base_url}/analyze/video",
-                    files=files,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
                     timeout=60
                 )
                 
@@ -54,7 +200,7 @@ class FileUploadTester:
                     print(f"Response: {response.text}")
                     return None
                 
-                data = response.json()
+                data = orjson.loads(response.content)
                 job_id = data.get("job_id")
                 print(f"Upload successful! Job ID: {job_id}")
                 
@@ -62,23 +208,53 @@ class FileUploadTester:
             print(f"Upload error: {e}")
             return None
             
-        # Poll for results
         print("Waiting for analysis to complete...")
-        max_attempts = 60  # 3 minutes max
-        attempt = 0
+        started = time.time()
+        
+        # Let the server push status changes when it supports it
+        handled, data = self.stream_job_events(job_id)
+        if handled:
+            if data is not None:
+                record_completion_time(self.base_url, time.time() - started)
+            return data
         
-        while attempt < max_attempts:
+        # Otherwise poll at times placed from past completion times
+        history = load_poll_history(self.base_url)
+        if len(history) >= MIN_HISTORY:
+            poll_times = adaptive_poll_schedule(history)
+        else:
+            poll_times = exponential_poll_schedule()
+        max_attempts = len(poll_times)
+        
+        # Each poll long-polls on the server, returning as soon as the status
+        # changes. Servers without long-polling answer at once, so polls still
+        # wait for their scheduled time; with it, those times have already passed.
+        status = None
+        for attempt, poll_at in enumerate(poll_times):
+            time.sleep(max(0.0, poll_at - (time.time() - started)))
+            # Held polls must not stretch the job past ANALYSIS_TIMEOUT
+            remaining = ANALYSIS_TIMEOUT - (time.time() - started)
+            if remaining <= 0:
+                break
+            wait = min(LONG_POLL_WAIT, remaining)
+            params = {"wait": round(wait, 1)}
+            if status:
+                params["since"] = status
             try:
-                response = self.session.get(f"{self.base_url}/jobs/{job_id}")
+                response = self.client.get(
+                    f"/jobs/{job_id}",
+                    params=params,
+                    timeout=httpx.Timeout(10.0, read=wait + LONG_POLL_MARGIN)
+                )
                 
                 if response.status_code != 200:
                     print(f"Status check failed: {response.status_code}")
                     return None
                     
-                data = response.json()
-                status = data.get("status")
+                status, data = self.parse_job_status(response.content)
                 
                 if status == "completed":
+                    record_completion_time(self.base_url, time.time() - started)
                     return data
                 elif status == "failed":
                     error = data.get("error", "Unknown error")
@@ -86,8 +262,6 @@ class FileUploadTester:
                     return None
                 elif status in ["queued", "processing"]:
                     print(f"Status: {status}... (attempt {attempt + 1}/{max_attempts})")
-                    time.sleep(3)
-                    attempt += 1
                 else:
                     print(f"Unknown status: {status}")
                     return None
@@ -168,8 +342,12 @@ class FileUploadTester:
             
         output_file = f"results_{filename}.json"
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            payload = orjson.dumps(
+                results,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+            with open(output_file, 'wb') as f:
+                f.write(payload)
             print(f"Results saved to: {output_file}")
         except Exception as e:
             print(f"Failed to save results: {e}")
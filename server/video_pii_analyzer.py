@@ -1,14 +1,79 @@
-import whisper
 import sys
 import os
 import librosa
 import numpy as np
-from scipy.signal import butter, filtfilt
+from scipy.signal import butter, sosfilt, sosfilt_zi, sosfiltfilt
 import tempfile
 import soundfile as sf
-import re
+import copy
+import hashlib
+import threading
+import queue
+from collections import OrderedDict
+from contextlib import nullcontext
 import torch
+from faster_whisper import WhisperModel
 from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+from transformers.pipelines.token_classification import AggregationStrategy
+from pii_regex import scan_pii, mask_spans, detect_phone_numbers_in_stream
+from pii_merge import merge_overlapping_entities
+
+# Quantize the NER models to int8 ONNX Runtime graphs on CPU-only hosts
+PII_ONNX_INT8 = os.getenv("PII_ONNX_INT8", "auto")
+ONNX_CACHE_DIR = os.path.join(os.getenv("HF_HOME", os.path.expanduser("~/.cache/huggingface")), "onnx-int8")
+
+def _use_onnx_int8():
+    if PII_ONNX_INT8 == "auto":
+        return not torch.cuda.is_available()
+    return PII_ONNX_INT8 == "1"
+
+def _load_onnx_int8_model(model_name):
+    """Export a token-classification model to ONNX and dynamically quantize it to int8"""
+    from optimum.onnxruntime import ORTModelForTokenClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    
+    save_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+    if not os.path.isdir(save_dir):
+        onnx_model = ORTModelForTokenClassification.from_pretrained(model_name, export=True)
+        quantizer = ORTQuantizer.from_pretrained(onnx_model)
+        quantizer.quantize(
+            save_dir=save_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+    return ORTModelForTokenClassification.from_pretrained(save_dir, file_name="model_quantized.onnx")
+
+def load_pii_pipeline(model_name):
+    """Build a token-classification pipeline: fp16 on GPU, int8 ONNX Runtime on CPU when enabled"""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    
+    # PII_ONNX_INT8=1 forces the int8 CPU graphs even when a GPU is present
+    if torch.cuda.is_available() and not _use_onnx_int8():
+        model = AutoModelForTokenClassification.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16
+        ).to("cuda").eval()
+        return pipeline(
+            "token-classification",
+            model=model,
+            tokenizer=tokenizer,
+            device=0,
+            torch_dtype=torch.float16,
+            aggregation_strategy="simple"
+        )
+    
+    model = model_name
+    if _use_onnx_int8():
+        try:
+            model = _load_onnx_int8_model(model_name)
+        except Exception as e:
+            print(f"   Warning: int8 ONNX export failed for {model_name}, using PyTorch: {e}")
+    
+    return pipeline(
+        "token-classification",
+        model=model,
+        tokenizer=tokenizer,
+        aggregation_strategy="simple"
+    )
 
 # Initialize multiple PII detection models for ensemble approach
 print("🤖 Loading multiple PII detection models...")
@@ -17,214 +82,407 @@ models = {}
 
 # Model 1: Stanford AIMI deidentifier
 print("   Loading Stanford AIMI...")
-models['stanford_aimi'] = pipeline(
-    "token-classification",
-    model="StanfordAIMI/stanford-deidentifier-base",
-    tokenizer="StanfordAIMI/stanford-deidentifier-base",
-    aggregation_strategy="simple"
-)
+models['stanford_aimi'] = load_pii_pipeline("StanfordAIMI/stanford-deidentifier-base")
 
 # Model 2: BERT NER for general entities
 print("   Loading BERT NER...")
-models['bert_ner'] = pipeline(
-    "token-classification",
-    model="dslim/bert-base-NER",
-    tokenizer="dslim/bert-base-NER",
-    aggregation_strategy="simple"
-)
+models['bert_ner'] = load_pii_pipeline("dslim/bert-base-NER")
 
 # Model 3: Isotonic DeBERTa AI4Privacy
 print("   Loading Isotonic DeBERTa...")
-models['isotonic_deberta'] = pipeline(
-    "token-classification",
-    model="Isotonic/deberta-v3-base_finetuned_ai4privacy_v2",
-    tokenizer="Isotonic/deberta-v3-base_finetuned_ai4privacy_v2",
-    aggregation_strategy="simple"
-)
+models['isotonic_deberta'] = load_pii_pipeline("Isotonic/deberta-v3-base_finetuned_ai4privacy_v2")
 
 print("✅ All PII detection models loaded successfully!")
 
-def detect_phone_numbers_in_stream(text):
-    """Enhanced phone number detection for continuous number streams"""
-    phone_patterns = [
-        # Singapore mobile numbers (8 digits starting with 8 or 9)
-        r'\b[89]\d{7}\b',
-        # Singapore landline numbers (8 digits starting with 6)
-        r'\b6\d{7}\b',
-        # International formats
-        r'\+65\s?[689]\d{7}',
-        r'\(\+65\)\s?[689]\d{7}',
-        # US numbers (10 digits)
-        r'\b\d{10}\b',
-        # Generic 8-digit patterns in continuous streams
-        r'\b\d{8}\b',
-        # 11-digit patterns (like +65 format without +)
-        r'\b65[689]\d{7}\b'
-    ]
-    
-    phone_matches = []
-    for pattern in phone_patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            # Additional validation for Singapore numbers
-            phone_num = match.group()
-            is_valid_sg = False
-            
-            # Check if it's a valid Singapore number
-            if len(phone_num) == 8:
-                if phone_num[0] in ['6', '8', '9']:
-                    is_valid_sg = True
-            elif len(phone_num) == 10 and phone_num.startswith('65'):
-                if phone_num[2] in ['6', '8', '9']:
-                    is_valid_sg = True
-            elif len(phone_num) == 10:  # US format
-                is_valid_sg = True
-            
-            if is_valid_sg:
-                phone_matches.append({
-                    "type": "PHONE_NUMBER",
-                    "text": phone_num,
-                    "confidence": 0.9,
-                    "start": match.start(),
-                    "end": match.end()
-                })
-    
-    return phone_matches
+def _tokenizer_fingerprint(tokenizer):
+    """Identify tokenizers that produce identical input_ids for the same text"""
+    # Slow and fast variants of the same WordPiece vocab encode identically,
+    # so the class itself is not part of the fingerprint
+    vocab = sorted(tokenizer.get_vocab().items())
+    digest = hashlib.sha1(repr(vocab).encode("utf-8"))
+    digest.update(repr(getattr(tokenizer, "do_lower_case", None)).encode("utf-8"))
+    return digest.hexdigest()
+
+def _group_by_tokenizer(models):
+    """Group ensemble members that can share one tokenization pass"""
+    groups = {}
+    for model_name, model_pipeline in models.items():
+        tokenizer = model_pipeline.tokenizer
+        fingerprint = _tokenizer_fingerprint(tokenizer)
+        shared_tokenizer, model_names = groups.setdefault(fingerprint, (tokenizer, []))
+        model_names.append(model_name)
+        # Encode with a fast tokenizer when any member has one (offsets need it)
+        if tokenizer.is_fast and not shared_tokenizer.is_fast:
+            groups[fingerprint] = (tokenizer, model_names)
+    return list(groups.values())
+
+model_groups = _group_by_tokenizer(models)
+
+# One CUDA stream per model so ensemble forwards can overlap on the GPU
+_model_streams = (
+    {model_name: torch.cuda.Stream() for model_name in models}
+    if torch.cuda.is_available() else {}
+)
+print(f"   {len(models)} models share {len(model_groups)} tokenizer(s)")
+
+# Content-addressed LRU cache of ensemble results, keyed by SHA-1 of the text
+PII_CACHE_SIZE = 4096
+_pii_cache = OrderedDict()
+_pii_cache_lock = threading.Lock()
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
 def detect_pii(text):
     """Enhanced PII detection using ensemble of multiple models"""
-    all_pii_found = []
-    
-    # Run detection with each model
-    for model_name, model_pipeline in models.items():
-        try:
-            results = model_pipeline(text)
-            
-            # Get detected PII with confidence scores
-            for entity in results:
-                all_pii_found.append({
-                    "type": entity['entity_group'],
-                    "text": entity['word'],
-                    "confidence": entity['score'],
-                    "start": entity['start'],
-                    "end": entity['end'],
-                    "model": model_name
-                })
-        except Exception as e:
-            print(f"   Warning: {model_name} failed: {e}")
-            continue
+    return detect_pii_batch([text])[0]
+
+def detect_pii_batch(texts, batch_size=32):
+    """Run the PII ensemble over many texts, serving repeats from the cache"""
+    if not texts:
+        return []
     
-    # Add enhanced phone number detection for continuous streams
-    phone_matches = detect_phone_numbers_in_stream(text)
-    for phone_match in phone_matches:
-        phone_match["model"] = "regex_phone"
-        all_pii_found.append(phone_match)
+    keys = [_text_key(text) for text in texts]
     
-    # Merge overlapping detections and vote on confidence
-    merged_pii = merge_overlapping_entities(all_pii_found)
+    # Collect unique texts that are not cached yet
+    cached = {}
+    missing = {}
+    with _pii_cache_lock:
+        for key, text in zip(keys, texts):
+            if key in cached or key in missing:
+                continue
+            if key in _pii_cache:
+                _pii_cache.move_to_end(key)
+                cached[key] = _pii_cache[key]
+            else:
+                missing[key] = text
     
-    # Sort by start position
-    merged_pii.sort(key=lambda x: x["start"])
+    if missing:
+        with torch.inference_mode():
+            fresh, failed_models = _detect_pii_uncached(list(missing.values()), batch_size)
+        with _pii_cache_lock:
+            for key, pii in zip(missing, fresh):
+                cached[key] = pii
+                # Results missing a failed model (e.g. CUDA OOM) are served once, not cached
+                if failed_models:
+                    continue
+                _pii_cache[key] = pii
+                if len(_pii_cache) > PII_CACHE_SIZE:
+                    _pii_cache.popitem(last=False)
     
-    return merged_pii
+    # Fan results back out; copies keep callers from mutating cached entries
+    return [copy.deepcopy(cached[key]) for key in keys]
 
-def merge_overlapping_entities(entities):
-    """Merge overlapping PII entities from different models"""
-    if not entities:
-        return []
+def _detect_pii_uncached(texts, batch_size):
+    """
+    Run the PII ensemble over many texts, one padded batch per model.
+    Returns (results per text, names of models that failed and were left out)
+    """
+    # Deterministic patterns first, in a single multi-pattern scan per text
+    all_pii_found = []
+    for text in texts:
+        regex_matches = scan_pii(text)
+        for regex_match in regex_matches:
+            regex_match["model"] = "regex"
+        all_pii_found.append(regex_matches)
     
-    # Sort by start position
-    entities.sort(key=lambda x: x["start"])
-    merged = []
+    # Only the residual text goes to the models; texts the patterns fully covered are
+    # skipped. Digit-only residuals still run, since the models flag ID/account numbers
+    ner_indices = []
+    ner_texts = []
+    for i, (text, regex_matches) in enumerate(zip(texts, all_pii_found)):
+        residual = mask_spans(text, regex_matches) if regex_matches else text
+        if residual.strip():
+            ner_indices.append(i)
+            ner_texts.append(residual)
     
-    i = 0
-    while i < len(entities):
-        current = entities[i]
-        overlapping = [current]
+    # Run detection with each model over the whole batch, tokenizing once per group
+    failed_models = set()
+    for tokenizer, model_names in model_groups:
+        if not ner_texts:
+            break
+        group_results = _run_model_group(tokenizer, model_names, ner_texts, batch_size)
+        failed_models.update(name for name in model_names if name not in group_results)
         
-        # Find all overlapping entities
-        j = i + 1
-        while j < len(entities):
-            next_entity = entities[j]
-            # Check if entities overlap
-            if (next_entity["start"] < current["end"] and 
-                next_entity["end"] > current["start"]):
-                overlapping.append(next_entity)
-                j += 1
-            else:
-                break
+        # Get detected PII with confidence scores
+        for model_name, batch_results in group_results.items():
+            for i, results in zip(ner_indices, batch_results):
+                pii_found = all_pii_found[i]
+                for entity in results:
+                    # Cast numpy scalars to native types so results serialize directly
+                    pii_found.append({
+                        "type": entity['entity_group'],
+                        "text": entity['word'],
+                        "confidence": float(entity['score']),
+                        "start": int(entity['start']),
+                        "end": int(entity['end']),
+                        "model": model_name
+                    })
+    
+    batch_pii = []
+    for text, pii_found in zip(texts, all_pii_found):
+        # Add enhanced phone number detection for continuous streams
+        phone_matches = detect_phone_numbers_in_stream(text)
+        for phone_match in phone_matches:
+            phone_match["model"] = "regex_phone"
+            pii_found.append(phone_match)
         
-        # Merge overlapping entities
-        if len(overlapping) == 1:
-            merged.append(current)
-        else:
-            # Choose the entity with highest confidence
-            best_entity = max(overlapping, key=lambda x: x["confidence"])
-            
-            # Add ensemble information
-            best_entity["ensemble_models"] = [e["model"] for e in overlapping]
-            best_entity["ensemble_count"] = len(overlapping)
-            best_entity["ensemble_avg_confidence"] = sum(e["confidence"] for e in overlapping) / len(overlapping)
-            
-            merged.append(best_entity)
+        # Merge overlapping detections and vote on confidence
+        merged_pii = merge_overlapping_entities(pii_found)
         
-        i = j if j > i + 1 else i + 1
+        # Sort by start position
+        merged_pii.sort(key=lambda x: x["start"])
+        batch_pii.append(merged_pii)
     
-    return merged
+    return batch_pii, failed_models
 
-def separate_vocals(audio_path):
+def _run_model_group(tokenizer, model_names, texts, batch_size):
+    """Tokenize texts once and run every model sharing that tokenizer on the encoding"""
+    if not tokenizer.is_fast:
+        # Offsets need a fast tokenizer; let each pipeline tokenize for itself
+        results = {}
+        for model_name in model_names:
+            try:
+                results[model_name] = models[model_name](texts, batch_size=batch_size)
+            except Exception as e:
+                print(f"   Warning: {model_name} failed: {e}")
+        return results
+    
+    results = {model_name: [] for model_name in model_names}
+    failed = set()
+    for batch_start in range(0, len(texts), batch_size):
+        batch = texts[batch_start:batch_start + batch_size]
+        encoding = tokenizer(
+            batch,
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True
+        )
+        offset_mapping = encoding.pop("offset_mapping").numpy()
+        special_tokens_mask = encoding.pop("special_tokens_mask").numpy()
+        input_ids = encoding["input_ids"].numpy()
+        lengths = encoding["attention_mask"].sum(dim=1).tolist()
+        
+        if torch.cuda.is_available():
+            # Page-locked host memory lets the H2D copies run asynchronously
+            encoding = {key: value.pin_memory() for key, value in encoding.items()}
+        
+        # Copy the shared encoding to each device once, not once per model
+        copy_stream = torch.cuda.current_stream() if _model_streams else None
+        device_inputs = {}
+        for model_name in model_names:
+            device = models[model_name].device
+            if model_name not in failed and device not in device_inputs:
+                device_inputs[device] = {
+                    key: value.to(device, non_blocking=True)
+                    for key, value in encoding.items()
+                }
+        
+        # Launch every model's forward first; on GPU each gets its own stream so
+        # the models overlap instead of running back to back
+        device_logits = {}
+        for model_name in model_names:
+            if model_name in failed:
+                continue
+            model_pipeline = models[model_name]
+            stream = _model_streams.get(model_name) if model_pipeline.device.type == "cuda" else None
+            try:
+                with torch.inference_mode(), (torch.cuda.stream(stream) if stream else nullcontext()):
+                    if stream:
+                        # The copies were queued on the caller's stream
+                        stream.wait_stream(copy_stream)
+                    inputs = device_inputs[model_pipeline.device]
+                    device_logits[model_name] = model_pipeline.model(**inputs).logits
+            except Exception as e:
+                print(f"   Warning: {model_name} failed: {e}")
+                failed.add(model_name)
+        
+        # Wait only on the ensemble's own streams so other GPU work (e.g. a
+        # concurrent Whisper decode) keeps running
+        for model_name in device_logits:
+            if model_name in _model_streams and models[model_name].device.type == "cuda":
+                _model_streams[model_name].synchronize()
+        
+        for model_name, model_logits in device_logits.items():
+            model_pipeline = models[model_name]
+            try:
+                logits = model_logits.float().cpu().numpy()
+                
+                # Softmax + the pipeline's own "simple" entity aggregation per text
+                for j, text in enumerate(batch):
+                    length = lengths[j]
+                    token_logits = logits[j, :length]
+                    scores = np.exp(token_logits - token_logits.max(axis=-1, keepdims=True))
+                    scores /= scores.sum(axis=-1, keepdims=True)
+                    pre_entities = model_pipeline.gather_pre_entities(
+                        text,
+                        input_ids[j, :length],
+                        scores,
+                        offset_mapping[j, :length],
+                        special_tokens_mask[j, :length],
+                        AggregationStrategy.SIMPLE
+                    )
+                    entities = model_pipeline.aggregate(pre_entities, AggregationStrategy.SIMPLE)
+                    results[model_name].append([
+                        entity for entity in entities
+                        if entity.get("entity_group", entity.get("entity")) != "O"
+                    ])
+            except Exception as e:
+                print(f"   Warning: {model_name} failed: {e}")
+                failed.add(model_name)
+    
+    return {model_name: batch_results for model_name, batch_results in results.items() if model_name not in failed}
+
+# Stereo weights for center channel extraction with reduced side information:
+# (L + R)/2 - 0.3 * (L - R)/2 == 0.35 * L + 0.65 * R
+CENTER_WEIGHTS = np.array([0.35, 0.65], dtype=np.float32)
+
+def _speech_band_sos(sr, low=80, high=8000):
+    """Band-pass for speech frequencies (80Hz - 8kHz) as float32 second-order sections"""
+    nyquist = sr / 2
+    return butter(5, [low / nyquist, high / nyquist], btype='band', output='sos').astype(np.float32)
+
+def _separate_vocals_streamed(audio_path, output_path):
     """
-    Extract vocals from audio using center channel extraction and filtering.
-    This removes most background music while preserving speech.
+    Filter a file soundfile can read in one-second blocks, so memory stays
+    O(block) regardless of duration. The first pass filters causally and
+    tracks the peak; the second rescales the written file in place.
     """
-    print("🎵 Separating vocals from background music...")
+    with sf.SoundFile(audio_path) as src:
+        sr = src.samplerate
+        sos = _speech_band_sos(sr)
+        zi = None
+        peak = 0.0
+        with sf.SoundFile(output_path, 'w', sr, 1, subtype='FLOAT') as dst:
+            for block in src.blocks(blocksize=sr, dtype='float32', always_2d=True):
+                mono = block[:, :2] @ CENTER_WEIGHTS if block.shape[1] > 1 else block[:, 0]
+                if zi is None:
+                    # Start the filter in steady state for the first sample
+                    zi = sosfilt_zi(sos).astype(np.float32) * mono[0]
+                filtered, zi = sosfilt(sos, mono, zi=zi)
+                filtered = filtered.astype(np.float32, copy=False)
+                peak = max(peak, float(np.abs(filtered).max()))
+                dst.write(filtered)
     
-    # Load audio file
+    # Normalize in place, one block at a time
+    if peak > 0:
+        scale = np.float32(1.0 / peak)
+        with sf.SoundFile(output_path, 'r+') as dst:
+            position = 0
+            while True:
+                dst.seek(position)
+                block = dst.read(sr, dtype='float32')
+                if not len(block):
+                    break
+                dst.seek(position)
+                dst.write(block * scale)
+                position += len(block)
+
+def _separate_vocals_in_memory(audio_path, output_path):
+    """Decode the whole file with librosa (audioread/ffmpeg) for formats soundfile cannot open"""
     y, sr = librosa.load(audio_path, sr=None, mono=False)
     
     # If stereo, extract center channel (vocals are usually centered)
     if len(y.shape) > 1:
-        # Center channel extraction: left + right - (left - right)
-        center = (y[0] + y[1]) / 2
-        sides = (y[0] - y[1]) / 2
-        vocals = center - 0.3 * sides  # Reduce side information
+        vocals = np.einsum('ct,c->t', y[:2], CENTER_WEIGHTS.astype(y.dtype))
     else:
         vocals = y
     
-    # Apply high-pass filter to remove low-frequency music
-    def high_pass_filter(data, sr, cutoff=80):
-        nyquist = sr / 2
-        normal_cutoff = cutoff / nyquist
-        b, a = butter(5, normal_cutoff, btype='high', analog=False)
-        return filtfilt(b, a, data)
+    # Zero-phase band-pass, kept in float32
+    vocals_filtered = sosfiltfilt(_speech_band_sos(sr), vocals.astype(np.float32, copy=False)).astype(np.float32, copy=False)
     
-    # Apply band-pass filter for speech frequencies (80Hz - 8kHz)
-    def band_pass_filter(data, sr, low=80, high=8000):
-        nyquist = sr / 2
-        low_normal = low / nyquist
-        high_normal = high / nyquist
-        b, a = butter(5, [low_normal, high_normal], btype='band', analog=False)
-        return filtfilt(b, a, data)
+    # Normalize audio in place
+    peak = np.abs(vocals_filtered).max()
+    if peak > 0:
+        np.multiply(vocals_filtered, 1.0 / peak, out=vocals_filtered)
     
-    # Apply filters
-    vocals_filtered = band_pass_filter(vocals, sr)
-    
-    # Normalize audio
-    vocals_filtered = vocals_filtered / np.max(np.abs(vocals_filtered))
+    sf.write(output_path, vocals_filtered, sr)
+
+def separate_vocals(audio_path):
+    """
+    Extract vocals from audio using center channel extraction and filtering.
+    This removes most background music while preserving speech.
+    """
+    print("🎵 Separating vocals from background music...")
     
-    # Save to temporary file
     temp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-    sf.write(temp_file.name, vocals_filtered, sr)
     temp_file.close()
     
+    try:
+        _separate_vocals_streamed(audio_path, temp_file.name)
+    except RuntimeError:
+        # libsndfile cannot open containers such as mp4; decode them in full
+        _separate_vocals_in_memory(audio_path, temp_file.name)
+    
     print(f"✅ Vocals extracted to temporary file")
     return temp_file.name
 
-def analyze_video_for_pii(video_path):
-    """Transcribe video and analyze for PII content"""
-    # Load the Whisper model
+def transcribe_with_overlapped_pii(model, audio_file, batch_size=8):
+    """
+    Transcribe with faster-whisper while a consumer thread runs segment PII
+    detection in batches on its own CUDA stream, overlapping the two models.
+    Returns (segments, segments_pii) in segment order.
+    """
+    segment_queue = queue.Queue()
+    segments_pii = []
+    consumer_errors = []
+    
+    def consume():
+        stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        pending = []
+        text = None
+        try:
+            while True:
+                text = segment_queue.get()
+                if text is not None:
+                    pending.append(text)
+                if pending and (text is None or len(pending) >= batch_size):
+                    with torch.cuda.stream(stream) if stream else nullcontext():
+                        segments_pii.extend(detect_pii_batch(pending))
+                    pending = []
+                if text is None:
+                    break
+            if stream:
+                stream.synchronize()
+        except Exception as e:
+            consumer_errors.append(e)
+            # Drain up to the sentinel unless it was the item that failed
+            if text is not None:
+                while segment_queue.get() is not None:
+                    pass
+    
+    consumer = threading.Thread(target=consume, name="segment-pii", daemon=True)
+    consumer.start()
+    
+    segments = []
+    try:
+        # The segment generator decodes lazily, so PII runs while Whisper continues
+        segment_generator, info = model.transcribe(audio_file, task="translate", beam_size=5)
+        for segment in segment_generator:
+            segments.append(segment)
+            segment_queue.put(segment.text.strip())
+    finally:
+        segment_queue.put(None)
+        consumer.join()
+    
+    if consumer_errors:
+        raise consumer_errors[0]
+    return segments, segments_pii
+
+def load_whisper_model():
+    """Load the Whisper model (CTranslate2, int8 weights)"""
     print("🤖 Loading Whisper model...")
-    model = whisper.load_model("medium")
+    if torch.cuda.is_available():
+        return WhisperModel("medium", device="cuda", compute_type="int8_float16")
+    return WhisperModel("medium", device="cpu", compute_type="int8")
+
+def analyze_video_for_pii(video_path, model=None):
+    """Transcribe video and analyze for PII content"""
+    # Reuse a preloaded Whisper model (e.g. from worker.py) when given
+    if model is None:
+        model = load_whisper_model()
     
     # Check if file exists
     if not os.path.exists(video_path):
@@ -239,14 +497,25 @@ def analyze_video_for_pii(video_path):
     # audio_file = separate_vocals(video_path)
     
     try:
-        # Transcribe the audio to English
-        result = model.transcribe(
-            audio_file, 
-            task="translate"
-        )
+        # Transcribe the audio to English, detecting segment PII as segments arrive
+        segments, segments_pii = transcribe_with_overlapped_pii(model, audio_file)
         
         # Get full transcript
-        full_transcript = result["text"]
+        segment_texts = [segment.text.strip() for segment in segments]
+        full_transcript = " ".join(segment_texts)
+        
+        # Segments partition the transcript, so transcript-level PII is the union of
+        # segment hits shifted by each segment's offset in the joined text
+        full_pii = []
+        char_offset = 0
+        for segment_text, segment_pii in zip(segment_texts, segments_pii):
+            for pii_item in segment_pii:
+                full_pii.append({
+                    **pii_item,
+                    "start": pii_item["start"] + char_offset,
+                    "end": pii_item["end"] + char_offset
+                })
+            char_offset += len(segment_text) + 1
         
         # Analyze full transcript for PII
         print("\n" + "="*60)
@@ -255,7 +524,6 @@ def analyze_video_for_pii(video_path):
         print(f"Transcript: {full_transcript}")
         print("-" * 40)
         
-        full_pii = detect_pii(full_transcript)
         if full_pii:
             print("⚠️  PII DETECTED IN FULL TRANSCRIPT:")
             for pii_item in full_pii:
@@ -272,13 +540,9 @@ def analyze_video_for_pii(video_path):
         print("="*60)
         
         pii_segments = []
-        for segment in result["segments"]:
-            start_time = f"{int(segment['start']//60)}:{int(segment['start']%60):02d}"
-            end_time = f"{int(segment['end']//60)}:{int(segment['end']%60):02d}"
-            segment_text = segment['text'].strip()
-            
-            # Detect PII in this segment
-            segment_pii = detect_pii(segment_text)
+        for segment, segment_text, segment_pii in zip(segments, segment_texts, segments_pii):
+            start_time = f"{int(segment.start//60)}:{int(segment.start%60):02d}"
+            end_time = f"{int(segment.end//60)}:{int(segment.end%60):02d}"
             
             print(f"[{start_time} -> {end_time}] {segment_text}")
             
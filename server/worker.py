@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Persistent PII analysis worker
+Loads Whisper and the PII ensemble once and serves CLI requests over a Unix socket
+"""
+
+import contextlib
+import fcntl
+import io
+import os
+import secrets
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing.connection import Client, Listener
+
+# Per-user runtime directory; the socket, auth key and lock all live here
+RUNTIME_DIR = os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+    f"pii-worker-{os.getuid()}"
+)
+SOCKET_PATH = os.getenv("PII_WORKER_SOCKET", os.path.join(RUNTIME_DIR, "pii.sock"))
+AUTHKEY_PATH = os.path.join(os.path.dirname(SOCKET_PATH), "pii.key")
+LOCK_PATH = os.path.join(os.path.dirname(SOCKET_PATH), "pii.lock")
+WORKER_LOG = os.getenv("PII_WORKER_LOG", os.path.join(RUNTIME_DIR, "pii_worker.log"))
+# Model loading can take minutes on first run (downloads)
+STARTUP_TIMEOUT = 600
+
+def ensure_private_dir(path):
+    """Create the socket directory as 0700 and refuse one other users can write to"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) & 0o077:
+        print(f"❌ {path} must be owned by you and not accessible to others (chmod 700)")
+        sys.exit(1)
+
+def load_authkey():
+    """Read the shared connection key, creating it on first use"""
+    try:
+        with open(AUTHKEY_PATH, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    # Write the key fully, then link it into place so a concurrent reader
+    # never sees a partial key; if another process won, use theirs
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(AUTHKEY_PATH))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(32))
+        try:
+            os.link(tmp_path, AUTHKEY_PATH)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp_path)
+    with open(AUTHKEY_PATH, "rb") as f:
+        return f.read()
+
+def serve():
+    """Load models once, then analyze each requested video"""
+    ensure_private_dir(os.path.dirname(SOCKET_PATH))
+    authkey = load_authkey()
+
+    # Only one worker may own the socket; a second one started by a racing client exits
+    lock_file = open(LOCK_PATH, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print("ℹ️  Another PII worker is already running", flush=True)
+        return
+
+    # Heavy imports stay here so the client side starts instantly
+    from video_pii_analyzer import analyze_video_for_pii, load_whisper_model
+
+    whisper_model = load_whisper_model()
+
+    # Holding the lock means any existing socket is stale
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    with Listener(SOCKET_PATH, family="AF_UNIX", authkey=authkey) as listener:
+        print(f"✅ PII worker listening on {SOCKET_PATH}", flush=True)
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # Failed handshake (wrong key) or client gone
+                print(f"⚠️  Rejected connection: {e}", flush=True)
+                continue
+            with conn:
+                try:
+                    video_path = conn.recv()
+                except EOFError:
+                    continue
+
+                # Capture the analyzer's report and send it back to the client
+                report = io.StringIO()
+                try:
+                    with contextlib.redirect_stdout(report):
+                        analyze_video_for_pii(video_path, model=whisper_model)
+                except Exception as e:
+                    report.write(f"❌ Analysis failed: {e}\n")
+
+                try:
+                    conn.send(report.getvalue())
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+def connect():
+    """Connect to the worker, spawning it on first use"""
+    ensure_private_dir(os.path.dirname(SOCKET_PATH))
+    authkey = load_authkey()
+    try:
+        return Client(SOCKET_PATH, family="AF_UNIX", authkey=authkey)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+
+    print("🚀 Starting PII worker (models load once and stay resident)...")
+    with open(WORKER_LOG, "ab") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "serve"],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            return Client(SOCKET_PATH, family="AF_UNIX", authkey=authkey)
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(1)
+
+    print(f"❌ PII worker did not start within {STARTUP_TIMEOUT}s, see {WORKER_LOG}")
+    sys.exit(1)
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python worker.py <path_to_video_file>")
+        print("       python worker.py serve")
+        print("\nThe first analysis starts a background worker that keeps the models loaded;")
+        print("later runs reuse it and skip model loading.")
+        sys.exit(1)
+
+    if sys.argv[1] == "serve":
+        serve()
+        return
+
+    video_path = os.path.abspath(sys.argv[1])
+    with connect() as conn:
+        conn.send(video_path)
+        print(conn.recv(), end="")
+
+if __name__ == "__main__":
+    main()